@@ -12,24 +12,42 @@ This script demonstrates DevOps cost optimization skills by:
 Author: Deniz
 """
 
+import codecs
+import io
 import json
+import sys
 import argparse
+from operator import itemgetter
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import orjson  # Optional: much faster JSON parsing/serialization
+except ImportError:
+    orjson = None
+
 # Configuration
 INVENTORY_FILE = "cloud_inventory.json"  # Input file 
 OUTPUT_FILE = "cloud_inventory_output.json"  # Output file (contains changes)
+DELTA_FILE = "cloud_inventory_delta.json"  # Output file for --delta (changed instances only)
 CPU_THRESHOLD = 5.0  # Servers with CPU usage below this are considered idle
 COST_THRESHOLD_HIGH = 100.0  # Monthly cost above this is flagged as expensive
 
+_DEV_ENVS = frozenset({"development", "staging", "ci-cd"})  # Non-production environments
+_YES = frozenset({"yes", "y"})  # Accepted confirmations at the interactive prompt
+_SHUTDOWN_REASON = "auto-optimization"  # Recorded on instances stopped by this tool
+
 
 def load_inventory(file_path: str) -> dict:
     """Load cloud inventory from JSON file."""
     try:
-        # Use utf-8-sig to handle Windows BOM (Byte Order Mark)
-        with open(file_path, 'r', encoding='utf-8-sig') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # Strip Windows BOM (Byte Order Mark) - orjson rejects it
+        data = data.removeprefix(codecs.BOM_UTF8)
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
     except FileNotFoundError:
         print(f"❌ Error: Inventory file '{file_path}' not found!")
         raise
@@ -38,29 +56,80 @@ def load_inventory(file_path: str) -> dict:
         raise
 
 
-def save_inventory(file_path: str, data: dict) -> None:
+def _write_json(file_path: str, data: dict, compact: bool = False) -> None:
+    """
+    Write data to a JSON file.
+    Compact output skips indentation for smaller, faster machine-readable files.
+    """
+    if orjson is not None:
+        if compact:
+            payload = orjson.dumps(data)
+        else:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    elif compact:
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    else:
+        payload = (json.dumps(data, indent=2) + "\n").encode('utf-8')
+    with open(file_path, 'wb') as f:
+        f.write(payload)
+
+
+def save_inventory(
+    file_path: str, data: dict, compact: bool = False, buf: io.StringIO | None = None
+) -> None:
     """Save updated inventory back to JSON file."""
-    with open(file_path, 'w') as f:
-        json.dump(data, f, indent=2)
-    print(f"💾 Inventory saved to {file_path}")
+    _write_json(file_path, data, compact)
+    message = f"💾 Inventory saved to {file_path}\n"
+    if buf is not None:
+        buf.write(message)
+    else:
+        sys.stdout.write(message)
+
+
+def _is_gpu_instance(inst: dict) -> bool:
+    """Check whether an instance looks like a GPU workload."""
+    # Cheap type-prefix test first so name.lower() only runs when it can matter
+    return inst["type"].startswith("p") or "gpu" in inst["name"].lower()
 
 
 def analyze_budget(inventory: dict) -> dict:
-    """Analyze instances against budget and identify over-budget resources."""
+    """
+    Analyze instances against budget and identify over-budget and idle resources.
+    Also records the facts the recommendations need, so no later pass is required.
+    """
     cloud_data = inventory["cloud_inventory"]
     budget = cloud_data["monthly_budget"]
     instances = cloud_data["instances"]
     
-    # Calculate total costs
-    total_monthly_cost = sum(inst["monthly_cost"] for inst in instances)
-    running_instances = [inst for inst in instances if inst["status"] == "running"]
-    running_cost = sum(inst["monthly_cost"] for inst in running_instances)
+    # Calculate costs and identify expensive and idle instances in a single pass
+    total_monthly_cost = 0.0
+    running_cost = 0.0
+    running_count = 0
+    over_budget_instances = []
+    over_budget_append = over_budget_instances.append
+    idle_instances = []
+    idle_append = idle_instances.append
+    has_gpu_expensive = False
+    has_dev_idle = False
+    cost_threshold = COST_THRESHOLD_HIGH
+    cpu_threshold = CPU_THRESHOLD
+    dev_envs = _DEV_ENVS
+    is_gpu_instance = _is_gpu_instance
     
-    # Identify expensive instances
-    over_budget_instances = [
-        inst for inst in instances 
-        if inst["monthly_cost"] > COST_THRESHOLD_HIGH
-    ]
+    for inst in instances:
+        cost = inst["monthly_cost"]
+        total_monthly_cost += cost
+        if inst["status"] == "running":
+            running_cost += cost
+            running_count += 1
+            if inst["cpu_usage"] < cpu_threshold:
+                idle_append(inst)
+                if not has_dev_idle and inst["environment"] in dev_envs:
+                    has_dev_idle = True
+        if cost > cost_threshold:
+            over_budget_append(inst)
+            if not has_gpu_expensive and is_gpu_instance(inst):
+                has_gpu_expensive = True
     
     return {
         "budget": budget,
@@ -69,149 +138,272 @@ def analyze_budget(inventory: dict) -> dict:
         "is_over_budget": total_monthly_cost > budget,
         "budget_remaining": budget - total_monthly_cost,
         "over_budget_instances": over_budget_instances,
-        "running_count": len(running_instances),
+        "idle_instances": idle_instances,
+        "idle_count": len(idle_instances),
+        "has_gpu_expensive": has_gpu_expensive,
+        "has_dev_idle": has_dev_idle,
+        "running_count": running_count,
         "total_count": len(instances)
     }
 
 
-def find_idle_instances(inventory: dict) -> list:
-    """Find running instances with CPU usage below threshold."""
-    instances = inventory["cloud_inventory"]["instances"]
+def _open_inventory_stream(file_path: str):
+    """Open an inventory file for streaming, positioned after any UTF-8 BOM."""
+    f = open(file_path, 'rb')
+    if f.read(len(codecs.BOM_UTF8)) != codecs.BOM_UTF8:
+        f.seek(0)
+    return f
+
+
+def stream_analyze_budget(file_path: str) -> dict:
+    """
+    Analyze an inventory straight from disk with ijson.
+    Each instance is folded into the totals as it is parsed and only
+    expensive or idle instances are kept, so memory stays flat no matter
+    how large the inventory is. Returns the same shape as analyze_budget.
+    """
+    # Optional dependency, only imported when streaming is requested
+    try:
+        import ijson
+    except ImportError:
+        raise SystemExit("❌ Error: --stream requires the 'ijson' package (pip install ijson)")
     
-    idle_instances = [
-        inst for inst in instances
-        if inst["status"] == "running" and inst["cpu_usage"] < CPU_THRESHOLD
-    ]
+    try:
+        with _open_inventory_stream(file_path) as f:
+            budget = next(ijson.items(f, 'cloud_inventory.monthly_budget', use_float=True), None)
+        if budget is None:
+            raise KeyError("monthly_budget")
+        
+        total_monthly_cost = 0.0
+        running_cost = 0.0
+        running_count = 0
+        total_count = 0
+        over_budget_instances = []
+        idle_instances = []
+        has_gpu_expensive = False
+        has_dev_idle = False
+        cost_threshold = COST_THRESHOLD_HIGH
+        cpu_threshold = CPU_THRESHOLD
+        dev_envs = _DEV_ENVS
+        is_gpu_instance = _is_gpu_instance
+        
+        with _open_inventory_stream(file_path) as f:
+            for inst in ijson.items(f, 'cloud_inventory.instances.item', use_float=True):
+                total_count += 1
+                cost = inst["monthly_cost"]
+                total_monthly_cost += cost
+                if inst["status"] == "running":
+                    running_cost += cost
+                    running_count += 1
+                    if inst["cpu_usage"] < cpu_threshold:
+                        idle_instances.append(inst)
+                        if not has_dev_idle and inst["environment"] in dev_envs:
+                            has_dev_idle = True
+                if cost > cost_threshold:
+                    over_budget_instances.append(inst)
+                    if not has_gpu_expensive and is_gpu_instance(inst):
+                        has_gpu_expensive = True
+    except FileNotFoundError:
+        print(f"❌ Error: Inventory file '{file_path}' not found!")
+        raise
+    except ijson.JSONError as e:
+        print(f"❌ Error: Invalid JSON in inventory file: {e}")
+        raise
     
-    return idle_instances
+    return {
+        "budget": budget,
+        "total_cost": total_monthly_cost,
+        "running_cost": running_cost,
+        "is_over_budget": total_monthly_cost > budget,
+        "budget_remaining": budget - total_monthly_cost,
+        "over_budget_instances": over_budget_instances,
+        "idle_instances": idle_instances,
+        "idle_count": len(idle_instances),
+        "has_gpu_expensive": has_gpu_expensive,
+        "has_dev_idle": has_dev_idle,
+        "running_count": running_count,
+        "total_count": total_count
+    }
 
 
-def shutdown_idle_instances(inventory: dict, idle_instances: list) -> float:
+def save_delta(
+    file_path: str, patches: list, shutdown_ts: str,
+    compact: bool = False, buf: io.StringIO | None = None
+) -> None:
+    """
+    Save only the changed instances as a patch file, stamped with the shutdown batch time.
+    Avoids re-encoding the whole inventory when just a few instances changed.
+    """
+    _write_json(file_path, {"generated": shutdown_ts, "patches": patches}, compact)
+    message = f"💾 Delta ({len(patches)} patch(es)) saved to {file_path}\n"
+    if buf is not None:
+        buf.write(message)
+    else:
+        sys.stdout.write(message)
+
+
+def shutdown_idle_instances(
+    inventory: dict, idle_instances: list,
+    patches: list | None = None, shutdown_ts: str | None = None
+) -> float:
     """
     Simulate shutting down idle instances.
-    Updates the inventory and returns total savings.
+    Updates the inventory and returns total savings. If a patches list is
+    given, the changed fields of each stopped instance are appended to it.
+    shutdown_ts defaults to the current time.
     """
     total_savings = 0.0
     
+    # Index inventory by ID once instead of re-scanning it per idle instance
+    by_id = {inst["instance_id"]: inst for inst in inventory["cloud_inventory"]["instances"]}
+    lookup = by_id.get
+    # One timestamp for the whole batch - the shutdown is a single action
+    if shutdown_ts is None:
+        shutdown_ts = datetime.now().isoformat()
+    shutdown_reason = _SHUTDOWN_REASON
+    
     for idle_inst in idle_instances:
-        # Find and update the instance in inventory
-        for inst in inventory["cloud_inventory"]["instances"]:
-            if inst["instance_id"] == idle_inst["instance_id"]:
-                inst["status"] = "stopped"
-                inst["previous_monthly_cost"] = inst["monthly_cost"]
-                total_savings += inst["monthly_cost"]
-                inst["monthly_cost"] = 0.0
-                inst["shutdown_reason"] = "auto-optimization"
-                inst["shutdown_timestamp"] = datetime.now().isoformat()
-                break
+        inst = lookup(idle_inst["instance_id"])
+        if inst is None:
+            continue
+        inst["status"] = "stopped"
+        inst["previous_monthly_cost"] = inst["monthly_cost"]
+        total_savings += inst["monthly_cost"]
+        inst["monthly_cost"] = 0.0
+        inst["shutdown_reason"] = shutdown_reason
+        inst["shutdown_timestamp"] = shutdown_ts
+        if patches is not None:
+            patches.append({
+                "instance_id": inst["instance_id"],
+                "status": inst["status"],
+                "previous_monthly_cost": inst["previous_monthly_cost"],
+                "monthly_cost": inst["monthly_cost"],
+                "shutdown_reason": shutdown_reason,
+                "shutdown_timestamp": shutdown_ts,
+            })
     
     return total_savings
 
 
-def print_report_header():
+def print_report_header(buf: io.StringIO):
     """Print the report header."""
-    print("\n" + "=" * 70)
-    print("☁️  CLOUD COST OPTIMIZATION REPORT")
-    print("=" * 70)
-    print(f"📅 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("-" * 70)
+    buf.write("\n" + "=" * 70 + "\n")
+    buf.write("☁️  CLOUD COST OPTIMIZATION REPORT\n")
+    buf.write("=" * 70 + "\n")
+    buf.write(f"📅 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    buf.write("-" * 70 + "\n")
 
 
-def print_budget_analysis(analysis: dict):
+def print_budget_analysis(analysis: dict, buf: io.StringIO):
     """Print budget analysis section."""
-    print("\n📊 BUDGET ANALYSIS")
-    print("-" * 40)
-    print(f"   Monthly Budget:     ${analysis['budget']:,.2f}")
-    print(f"   Total Monthly Cost: ${analysis['total_cost']:,.2f}")
-    print(f"   Running Cost:       ${analysis['running_cost']:,.2f}")
-    print(f"   Budget Remaining:   ${analysis['budget_remaining']:,.2f}")
-    print(f"   Instances:          {analysis['running_count']} running / {analysis['total_count']} total")
+    buf.write("\n📊 BUDGET ANALYSIS\n")
+    buf.write("-" * 40 + "\n")
+    buf.write(f"   Monthly Budget:     ${analysis['budget']:,.2f}\n")
+    buf.write(f"   Total Monthly Cost: ${analysis['total_cost']:,.2f}\n")
+    buf.write(f"   Running Cost:       ${analysis['running_cost']:,.2f}\n")
+    buf.write(f"   Budget Remaining:   ${analysis['budget_remaining']:,.2f}\n")
+    buf.write(f"   Instances:          {analysis['running_count']} running / {analysis['total_count']} total\n")
     
     if analysis['is_over_budget']:
         overage = abs(analysis['budget_remaining'])
-        print(f"\n   ⚠️  WARNING: Over budget by ${overage:,.2f}!")
+        buf.write(f"\n   ⚠️  WARNING: Over budget by ${overage:,.2f}!\n")
     else:
-        print(f"\n   ✅ Within budget")
+        buf.write(f"\n   ✅ Within budget\n")
 
 
-def print_expensive_instances(instances: list):
+def print_expensive_instances(instances: list, buf: io.StringIO):
     """Print instances that are over the cost threshold."""
     if not instances:
-        print("\n✅ No instances exceed the cost threshold.")
+        buf.write("\n✅ No instances exceed the cost threshold.\n")
         return
     
-    print(f"\n💰 EXPENSIVE INSTANCES (>${COST_THRESHOLD_HIGH}/month)")
-    print("-" * 40)
+    buf.write(f"\n💰 EXPENSIVE INSTANCES (>${COST_THRESHOLD_HIGH}/month)\n")
+    buf.write("-" * 40 + "\n")
     
-    for inst in sorted(instances, key=lambda x: x["monthly_cost"], reverse=True):
+    write = buf.write
+    for inst in sorted(instances, key=itemgetter("monthly_cost"), reverse=True):
         status_icon = "🟢" if inst["status"] == "running" else "🔴"
-        print(f"\n   {status_icon} {inst['name']}")
-        print(f"      Instance ID: {inst['instance_id']}")
-        print(f"      Type:        {inst['type']}")
-        print(f"      Monthly:     ${inst['monthly_cost']:,.2f}")
-        print(f"      CPU Usage:   {inst['cpu_usage']}%")
-        print(f"      Owner:       {inst['owner']}")
-        print(f"      Environment: {inst['environment']}")
-
-
-def print_idle_instances(instances: list):
+        write(
+            f"\n   {status_icon} {inst['name']}\n"
+            f"      Instance ID: {inst['instance_id']}\n"
+            f"      Type:        {inst['type']}\n"
+            f"      Monthly:     ${inst['monthly_cost']:,.2f}\n"
+            f"      CPU Usage:   {inst['cpu_usage']}%\n"
+            f"      Owner:       {inst['owner']}\n"
+            f"      Environment: {inst['environment']}\n"
+        )
+
+
+def print_idle_instances(instances: list, buf: io.StringIO):
     """Print idle instances that could be shut down."""
     if not instances:
-        print("\n✅ No idle instances detected.")
+        buf.write("\n✅ No idle instances detected.\n")
         return
     
-    print(f"\n😴 IDLE INSTANCES (CPU < {CPU_THRESHOLD}%, Status: Running)")
-    print("-" * 40)
+    buf.write(f"\n😴 IDLE INSTANCES (CPU < {CPU_THRESHOLD}%, Status: Running)\n")
+    buf.write("-" * 40 + "\n")
     
     potential_savings = sum(inst["monthly_cost"] for inst in instances)
     
+    write = buf.write
     for inst in instances:
-        print(f"\n   🔸 {inst['name']}")
-        print(f"      Instance ID: {inst['instance_id']}")
-        print(f"      Type:        {inst['type']}")
-        print(f"      CPU Usage:   {inst['cpu_usage']}%")
-        print(f"      Monthly:     ${inst['monthly_cost']:,.2f}")
-        print(f"      Environment: {inst['environment']}")
+        write(
+            f"\n   🔸 {inst['name']}\n"
+            f"      Instance ID: {inst['instance_id']}\n"
+            f"      Type:        {inst['type']}\n"
+            f"      CPU Usage:   {inst['cpu_usage']}%\n"
+            f"      Monthly:     ${inst['monthly_cost']:,.2f}\n"
+            f"      Environment: {inst['environment']}\n"
+        )
     
-    print(f"\n   💡 Potential Monthly Savings: ${potential_savings:,.2f}")
+    buf.write(f"\n   💡 Potential Monthly Savings: ${potential_savings:,.2f}\n")
 
 
-def print_optimization_results(idle_count: int, savings: float):
+def print_optimization_results(idle_count: int, savings: float, buf: io.StringIO):
     """Print optimization results after shutdown."""
-    print("\n🔧 OPTIMIZATION ACTIONS TAKEN")
-    print("-" * 40)
-    print(f"   ✅ Shut down {idle_count} idle instance(s)")
-    print(f"   💵 Monthly Savings: ${savings:,.2f}")
-    print(f"   💵 Annual Savings:  ${savings * 12:,.2f}")
+    buf.write("\n🔧 OPTIMIZATION ACTIONS TAKEN\n")
+    buf.write("-" * 40 + "\n")
+    buf.write(f"   ✅ Shut down {idle_count} idle instance(s)\n")
+    buf.write(f"   💵 Monthly Savings: ${savings:,.2f}\n")
+    buf.write(f"   💵 Annual Savings:  ${savings * 12:,.2f}\n")
 
 
-def print_recommendations(analysis: dict, idle_instances: list):
+def print_recommendations(analysis: dict, buf: io.StringIO):
     """Print cost optimization recommendations."""
-    print("\n📋 RECOMMENDATIONS")
-    print("-" * 40)
+    buf.write("\n📋 RECOMMENDATIONS\n")
+    buf.write("-" * 40 + "\n")
     
     recommendations = []
     
     if analysis['is_over_budget']:
         recommendations.append("🔴 CRITICAL: Reduce spending to meet budget target")
     
-    if idle_instances:
-        recommendations.append(f"🟡 Review {len(idle_instances)} idle instances for shutdown")
+    if analysis['idle_count']:
+        recommendations.append(f"🟡 Review {analysis['idle_count']} idle instances for shutdown")
     
-    expensive = analysis['over_budget_instances']
-    gpu_instances = [i for i in expensive if 'gpu' in i['name'].lower() or i['type'].startswith('p')]
-    if gpu_instances:
+    if analysis['has_gpu_expensive']:
         recommendations.append("🟡 Consider using spot instances for GPU workloads")
     
-    dev_idle = [i for i in idle_instances if i['environment'] in ['development', 'staging', 'ci-cd']]
-    if dev_idle:
+    if analysis['has_dev_idle']:
         recommendations.append("🟢 Implement auto-stop for non-production environments")
     
     if not recommendations:
         recommendations.append("✅ Infrastructure is well-optimized!")
     
     for i, rec in enumerate(recommendations, 1):
-        print(f"   {i}. {rec}")
+        buf.write(f"   {i}. {rec}\n")
+
+
+def prompt_shutdown(buf: io.StringIO) -> bool:
+    """
+    Ask the user whether to shut down idle instances.
+    The buffered report so far is written out first so it is visible at the prompt.
+    """
+    sys.stdout.write(buf.getvalue())
+    buf.seek(0)
+    buf.truncate()
+    user_input = input("🔄 Shut down idle instances? (yes/no): ").strip().lower()
+    return user_input in _YES
 
 
 def parse_arguments():
@@ -223,7 +415,11 @@ def parse_arguments():
 Examples:
   python cloud_cost_optimizer.py              # Interactive mode
   python cloud_cost_optimizer.py --auto       # Auto-shutdown idle instances
+  python cloud_cost_optimizer.py --yes        # Full report, shut down without prompting
   python cloud_cost_optimizer.py --dry-run    # Report only, no changes
+  python cloud_cost_optimizer.py --auto --compact  # Write compact JSON output
+  python cloud_cost_optimizer.py --auto --delta    # Write only the changed instances
+  python cloud_cost_optimizer.py --stream     # Constant-memory report (needs ijson)
         """
     )
     parser.add_argument(
@@ -231,11 +427,31 @@ Examples:
         action="store_true",
         help="Automatically shut down idle instances without prompting"
     )
+    parser.add_argument(
+        "-y", "--yes",
+        action="store_true",
+        help="Answer yes to the shutdown prompt (for scripts and pipelines)"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true", 
         help="Run analysis only, do not make any changes"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write the output inventory as compact (non-indented) JSON"
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help=f"Write only the changed instances as patches to {DELTA_FILE}"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream-parse the inventory with ijson for constant memory use (report only)"
+    )
     return parser.parse_args()
 
 
@@ -246,54 +462,89 @@ def main():
     script_dir = Path(__file__).parent
     inventory_path = script_dir / INVENTORY_FILE
     output_path = script_dir / OUTPUT_FILE
+    delta_path = script_dir / DELTA_FILE
     
-    # Load inventory
-    print("📂 Loading cloud inventory...")
-    inventory = load_inventory(inventory_path)
-    
-    # Print report header
-    print_report_header()
-    
-    # Analyze budget
-    analysis = analyze_budget(inventory)
-    print_budget_analysis(analysis)
-    
-    # Show expensive instances
-    print_expensive_instances(analysis['over_budget_instances'])
+    # Load inventory (streaming mode analyzes it while parsing)
+    if args.stream:
+        print("📂 Streaming cloud inventory...")
+        inventory = None
+        analysis = stream_analyze_budget(inventory_path)
+        instance_count = analysis['total_count']
+    else:
+        print("📂 Loading cloud inventory...")
+        inventory = load_inventory(inventory_path)
+        analysis = None
+        instance_count = len(inventory["cloud_inventory"]["instances"])
     
-    # Find idle instances
-    idle_instances = find_idle_instances(inventory)
-    print_idle_instances(idle_instances)
+    # Collect the report in memory and write it to stdout in one go;
+    # the finally block makes sure a failure part-way still shows what was produced
+    buf = io.StringIO()
     
-    # Simulate shutdown of idle instances
-    if idle_instances:
-        print("\n" + "=" * 70)
+    try:
+        # Print report header
+        print_report_header(buf)
         
-        if args.dry_run:
-            print("   🔍 DRY RUN MODE - No changes will be made")
-        elif args.auto:
-            print("   🤖 AUTO MODE - Shutting down idle instances...")
-            savings = shutdown_idle_instances(inventory, idle_instances)
-            save_inventory(output_path, inventory)
-            print_optimization_results(len(idle_instances), savings)
-        else:
-            # Interactive mode
-            user_input = input("🔄 Shut down idle instances? (yes/no): ").strip().lower()
+        # Nothing to analyze - skip the whole pipeline
+        if not instance_count:
+            buf.write("\nℹ️  No instances to analyze.\n\n")
+            return
+        
+        # Analyze budget
+        if analysis is None:
+            analysis = analyze_budget(inventory)
+        print_budget_analysis(analysis, buf)
+        
+        # Show expensive instances
+        print_expensive_instances(analysis['over_budget_instances'], buf)
+        
+        # Show idle instances
+        idle_instances = analysis['idle_instances']
+        print_idle_instances(idle_instances, buf)
+        
+        # Simulate shutdown of idle instances
+        if idle_instances:
+            buf.write("\n" + "=" * 70 + "\n")
             
-            if user_input in ['yes', 'y']:
-                savings = shutdown_idle_instances(inventory, idle_instances)
-                save_inventory(output_path, inventory)
-                print_optimization_results(len(idle_instances), savings)
+            if args.dry_run:
+                buf.write("   🔍 DRY RUN MODE - No changes will be made\n")
+            elif args.stream:
+                # The full inventory was never held in memory, so there is nothing to rewrite
+                buf.write("   🌊 STREAM MODE - Report only, no changes will be made\n")
             else:
-                print("   ℹ️  No changes made. Idle instances remain running.")
-    
-    # Print recommendations
-    print_recommendations(analysis, idle_instances)
-    
-    # Footer
-    print("\n" + "=" * 70)
-    print("📊 Report Complete - DevOps Cost Optimization Demo")
-    print("=" * 70 + "\n")
+                # --auto and --yes skip the prompt, which only runs when someone can answer it
+                if args.auto:
+                    buf.write("   🤖 AUTO MODE - Shutting down idle instances...\n")
+                    confirmed = True
+                elif args.yes:
+                    buf.write("   ✅ Confirmed via --yes - Shutting down idle instances...\n")
+                    confirmed = True
+                elif sys.stdin.isatty():
+                    confirmed = prompt_shutdown(buf)
+                else:
+                    buf.write("   ℹ️  No terminal to confirm on - pass --yes or --auto to apply changes.\n")
+                    confirmed = False
+                
+                if confirmed:
+                    patches = []
+                    shutdown_ts = datetime.now().isoformat()
+                    savings = shutdown_idle_instances(inventory, idle_instances, patches, shutdown_ts)
+                    if args.delta:
+                        save_delta(delta_path, patches, shutdown_ts, compact=args.compact, buf=buf)
+                    else:
+                        save_inventory(output_path, inventory, compact=args.compact, buf=buf)
+                    print_optimization_results(len(patches), savings, buf)
+                else:
+                    buf.write("   ℹ️  No changes made. Idle instances remain running.\n")
+        
+        # Print recommendations
+        print_recommendations(analysis, buf)
+        
+        # Footer
+        buf.write("\n" + "=" * 70 + "\n")
+        buf.write("📊 Report Complete - DevOps Cost Optimization Demo\n")
+        buf.write("=" * 70 + "\n\n")
+    finally:
+        sys.stdout.write(buf.getvalue())
 
 
 if __name__ == "__main__":